@@ -24,7 +24,7 @@ def run_etl_pipeline(url: str = "https://fashion-studio.dicoding.dev/",
     
     Args:
         url (str): URL to extract data from
-        output_file (str): Output CSV file path
+        output_file (str): Output file path (.csv or .parquet)
         mode (str): Loading mode - 'overwrite' or 'append'
         max_pages (int): Maximum number of pages to scrape
         
@@ -103,11 +103,15 @@ def main():
                        help='URL to extract data from')
     parser.add_argument('--output', 
                        default='products.csv',
-                       help='Output CSV file path')
+                       help='Output file path, .csv or .parquet (the extension selects the format)')
     parser.add_argument('--mode', 
                        choices=['overwrite', 'append'],
                        default='overwrite',
                        help='Loading mode: overwrite or append')
+    parser.add_argument('--format', 
+                       choices=['csv', 'parquet'],
+                       default=None,
+                       help='Output file format (replaces the extension of --output)')
     parser.add_argument('--max-pages', 
                        type=int,
                        default=50,
@@ -115,10 +119,18 @@ def main():
     
     args = parser.parse_args()
     
+    output_file = args.output
+    if args.format:
+        output_file = f"{os.path.splitext(output_file)[0]}.{args.format}"
+    
+    # Fail before the crawl rather than after it
+    if args.mode == 'append' and output_file.endswith('.parquet'):
+        parser.error("append mode is not supported for Parquet output")
+    
     # Run the ETL pipeline
     success = run_etl_pipeline(
         url=args.url,
-        output_file=args.output,
+        output_file=output_file,
         mode=args.mode,
         max_pages=args.max_pages
     )
@@ -3,12 +3,14 @@ Unit tests for the extract module
 """
 
 import pytest
+import asyncio
 import sys
 import os
 
 # Add utils directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
+import utils.extract
 from utils.extract import fetch_webpage, parse_product_data, extract_fashion_data
 
 
@@ -27,6 +29,94 @@ class TestExtract:
         html_content = fetch_webpage("https://invalid-url-that-does-not-exist.com")
         assert html_content is None
     
+    def test_fetch_webpage_uses_cache_when_not_modified(self, monkeypatch, tmp_path):
+        """Test that a 304 response is served from the local page cache"""
+        class FakeResponse:
+            def __init__(self, status_code, text='', headers=None):
+                self.status_code = status_code
+                self.text = text
+                self.headers = headers or {}
+            
+            def raise_for_status(self):
+                pass
+        
+        sent_headers = []
+        responses = [
+            FakeResponse(200, '<html>cached page</html>', {'ETag': '"v1"'}),
+            FakeResponse(304),
+        ]
+        
+        def fake_get(url, headers=None, timeout=None):
+            sent_headers.append(headers)
+            return responses.pop(0)
+        
+        monkeypatch.setattr(utils.extract, 'HTTP_CACHE_DIR', str(tmp_path))
+        monkeypatch.setattr(utils.extract._SESSION, 'get', fake_get)
+        
+        assert fetch_webpage("https://example.com/") == '<html>cached page</html>'
+        assert fetch_webpage("https://example.com/") == '<html>cached page</html>'
+        assert sent_headers == [{}, {'If-None-Match': '"v1"'}]
+    
+    def test_fetch_all_retries_server_errors(self, monkeypatch, tmp_path):
+        """Test that concurrent fetching retries temporary server errors"""
+        web = pytest.importorskip("aiohttp.web")
+        from aiohttp.test_utils import TestServer
+        
+        monkeypatch.setattr(utils.extract, 'HTTP_CACHE_DIR', str(tmp_path))
+        monkeypatch.setattr(utils.extract, 'RETRY_BACKOFF_FACTOR', 0)
+        calls = []
+        
+        async def handler(request):
+            calls.append(request.path)
+            if request.path == '/missing':
+                return web.Response(status=404)
+            if len([path for path in calls if path == '/']) < 3:
+                return web.Response(status=503)
+            return web.Response(text='<html>ok</html>')
+        
+        async def run():
+            app = web.Application()
+            app.router.add_get('/', handler)
+            app.router.add_get('/missing', handler)
+            async with TestServer(app) as server:
+                urls = [str(server.make_url('/')), str(server.make_url('/missing'))]
+                return await utils.extract._fetch_all(urls)
+        
+        assert asyncio.run(run()) == ['<html>ok</html>', None]
+        # 503 twice then success, 404 is not retried
+        assert calls.count('/') == 3
+        assert calls.count('/missing') == 1
+    
+    def test_fetch_all_survives_bad_pages(self, monkeypatch, tmp_path):
+        """Test that an undecodable or failing page does not abort the other fetches"""
+        web = pytest.importorskip("aiohttp.web")
+        from aiohttp.test_utils import TestServer
+        
+        monkeypatch.setattr(utils.extract, 'HTTP_CACHE_DIR', str(tmp_path))
+        
+        async def handler(request):
+            if request.path == '/latin1':
+                return web.Response(body=b'caf\xe9', content_type='text/html', charset='utf-8')
+            return web.Response(text='<html>ok</html>', headers={'ETag': '"v1"'})
+        
+        def failing_store(url, response_headers, body):
+            if url.endswith('/'):
+                raise OSError("disk full")
+        
+        async def run():
+            app = web.Application()
+            app.router.add_get('/latin1', handler)
+            app.router.add_get('/', handler)
+            async with TestServer(app) as server:
+                urls = [str(server.make_url('/latin1')), str(server.make_url('/'))]
+                return await utils.extract._fetch_all(urls)
+        
+        assert asyncio.run(run()) == ['caf\ufffd', '<html>ok</html>']
+        
+        # The second page now fails while being cached, the first is still returned
+        monkeypatch.setattr(utils.extract, '_store_cached_page', failing_store)
+        assert asyncio.run(run()) == ['caf\ufffd', None]
+    
     def test_parse_product_data_empty_html(self):
         """Test parsing with empty HTML"""
         products = parse_product_data("", "2025-06-15 10:00:00")
@@ -138,6 +228,27 @@ class TestExtract:
             required_keys = ['title', 'price', 'rating', 'colors', 'size', 'gender', 'timestamp']
             for key in required_keys:
                 assert key in product
+    
+    def test_extract_fashion_data_thread_pool_fallback(self, monkeypatch):
+        """Test extraction through the thread pool when aiohttp is not available"""
+        card = """
+            <div class="collection-card">
+                <h3 class="product-title">Product {page}</h3>
+                <span class="price">$10.00</span>
+            </div>
+        """
+        pages = {
+            "https://example.com/": card.format(page=1),
+            "https://example.com/page2": card.format(page=2),
+            "https://example.com/page3": "<html><body></body></html>",
+        }
+        monkeypatch.setattr(utils.extract, 'aiohttp', None)
+        monkeypatch.setattr(utils.extract, 'fetch_webpage', pages.get)
+        
+        products = extract_fashion_data("https://example.com/", max_pages=4)
+        
+        # Stops at the first page without products
+        assert [product['title'] for product in products] == ['Product 1', 'Product 2']
 
 
 if __name__ == "__main__":
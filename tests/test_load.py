@@ -3,17 +3,20 @@ Unit tests for the load module
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 import os
+import shutil
 import tempfile
 import sys
 
 # Add utils directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
+import utils.load
 from utils.load import (
-    validate_dataframe, save_to_csv, append_to_csv, 
-    generate_summary_report, load_fashion_data
+    validate_dataframe, write_csv, create_backup, save_to_csv, append_to_csv, 
+    generate_summary_report, load_fashion_data, KEY_INDEX_SUFFIX
 )
 
 
@@ -81,6 +84,39 @@ class TestLoad:
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
     
+    @pytest.mark.parametrize("use_pyarrow", [True, False])
+    def test_write_csv_roundtrip(self, monkeypatch, use_pyarrow):
+        """Test CSV writing with and without the PyArrow writer"""
+        if not use_pyarrow:
+            monkeypatch.setattr(utils.load, 'pacsv', None)
+        # Write one row per batch to exercise the chunked path
+        monkeypatch.setattr(utils.load, 'CSV_WRITE_CHUNK_ROWS', 1)
+        
+        df = pd.DataFrame({
+            'title': ['Product 1', 'Product, 2'],
+            'price': [415840.0, 735840.0],
+            'rating': [4.5, 3.8],
+            'colors': [3, 2],
+            'size': ['M', 'L'],
+            'gender': ['Men', 'Women'],
+            'timestamp': ['2025-06-15 10:00:00', '2025-06-15 10:00:00']
+        })
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as tmp_file:
+            tmp_path = tmp_file.name
+        
+        try:
+            write_csv(df, tmp_path)
+            
+            loaded_df = pd.read_csv(tmp_path)
+            assert list(loaded_df.columns) == list(df.columns)
+            assert list(loaded_df['title']) == ['Product 1', 'Product, 2']
+            assert list(loaded_df['price']) == [415840.0, 735840.0]
+            
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
     def test_save_to_csv_invalid_dataframe(self):
         """Test CSV saving with invalid dataframe"""
         df = pd.DataFrame()  # Empty dataframe
@@ -96,6 +132,24 @@ class TestLoad:
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
     
+    def test_create_backup_copies_file(self):
+        """Test backup is a byte-for-byte copy that keeps the file's mtime"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'products.csv')
+            content = b'title,price\n"Product, 1",415840.0\n'
+            with open(file_path, 'wb') as fh:
+                fh.write(content)
+            os.utime(file_path, (1700000000, 1700000000))
+            
+            assert create_backup(file_path) == True
+            
+            backups = [name for name in os.listdir(tmp_dir) if name.startswith('products.csv.backup_')]
+            assert len(backups) == 1
+            backup_path = os.path.join(tmp_dir, backups[0])
+            with open(backup_path, 'rb') as fh:
+                assert fh.read() == content
+            assert os.path.getmtime(backup_path) == 1700000000
+    
     def test_append_to_csv_new_file(self):
         """Test appending to CSV when file doesn't exist"""
         df = pd.DataFrame({
@@ -169,8 +223,138 @@ class TestLoad:
             assert 'Product 2' in loaded_df['title'].values
             
         finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            for path in (tmp_path, tmp_path + KEY_INDEX_SUFFIX):
+                if os.path.exists(path):
+                    os.unlink(path)
+    
+    def test_append_to_csv_skips_duplicates(self):
+        """Test that appending does not duplicate rows already in the file"""
+        df = pd.DataFrame({
+            'title': ['Product 1', 'Product 2'],
+            'price': [415840.0, 735840.0],
+            'rating': [4.5, 3.8],
+            'colors': [3, 2],
+            'size': ['M', 'L'],
+            'gender': ['Men', 'Women'],
+            'timestamp': ['2025-06-15 10:00:00', '2025-06-15 10:00:00']
+        })
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as tmp_file:
+            tmp_path = tmp_file.name
+        
+        try:
+            df.iloc[:1].to_csv(tmp_path, index=False)
+            
+            result = append_to_csv(df, tmp_path)
+            assert result == True
+            
+            loaded_df = pd.read_csv(tmp_path)
+            assert list(loaded_df['title']) == ['Product 1', 'Product 2']
+            assert list(loaded_df.columns) == list(df.columns)
+            
+            # Second append is checked against the key sidecar file
+            assert os.path.exists(tmp_path + KEY_INDEX_SUFFIX)
+            assert append_to_csv(df, tmp_path) == True
+            assert len(pd.read_csv(tmp_path)) == 2
+            
+            # The sidecar keeps one key per row, sorted for binary search
+            with np.load(tmp_path + KEY_INDEX_SUFFIX) as index:
+                keys = index['hashes']
+                recorded_mtime_ns = int(index['csv_mtime_ns'])
+            assert len(keys) == 2
+            assert list(keys) == sorted(keys)
+            
+            # Overwriting the CSV makes the sidecar stale even if the modification
+            # time is unchanged, keys are re-read from the file
+            df.iloc[1:].to_csv(tmp_path, index=False)
+            os.utime(tmp_path, ns=(0, recorded_mtime_ns))
+            assert append_to_csv(df, tmp_path) == True
+            assert list(pd.read_csv(tmp_path)['title']) == ['Product 2', 'Product 1']
+            
+        finally:
+            for path in (tmp_path, tmp_path + KEY_INDEX_SUFFIX):
+                if os.path.exists(path):
+                    os.unlink(path)
+    
+    def test_append_to_csv_after_restoring_backup(self):
+        """Test that restoring a backup over the CSV invalidates the key sidecar"""
+        df = pd.DataFrame({
+            'title': ['Product 1', 'Product 2'],
+            'price': [415840.0, 735840.0],
+            'rating': [4.5, 3.8],
+            'colors': [3, 2],
+            'size': ['M', 'L'],
+            'gender': ['Men', 'Women'],
+            'timestamp': ['2025-06-15 10:00:00', '2025-06-15 10:00:00']
+        })
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'products.csv')
+            
+            assert save_to_csv(df.iloc[:1], file_path, create_backup_flag=False) == True
+            assert save_to_csv(df.iloc[:1], file_path) == True
+            backups = [name for name in os.listdir(tmp_dir) if name.startswith('products.csv.backup_')]
+            assert len(backups) == 1
+            
+            assert append_to_csv(df.iloc[1:], file_path) == True
+            assert os.path.exists(file_path + KEY_INDEX_SUFFIX)
+            
+            # Restoring keeps the backup's older modification time
+            shutil.copy2(os.path.join(tmp_dir, backups[0]), file_path)
+            assert append_to_csv(df.iloc[1:], file_path) == True
+            assert list(pd.read_csv(file_path)['title']) == ['Product 1', 'Product 2']
+            
+            # Overwriting the CSV removes its key sidecar
+            assert save_to_csv(df, file_path, create_backup_flag=False) == True
+            assert not os.path.exists(file_path + KEY_INDEX_SUFFIX)
+    
+    @pytest.mark.parametrize("sidecar_content", [b'not a key index', b''])
+    def test_append_to_csv_unreadable_sidecar(self, sidecar_content):
+        """Test that an unreadable key sidecar is rebuilt from the CSV file"""
+        df = pd.DataFrame({
+            'title': ['Product 1', 'Product 2'],
+            'price': [415840.0, 735840.0],
+            'rating': [4.5, 3.8],
+            'colors': [3, 2],
+            'size': ['M', 'L'],
+            'gender': ['Men', 'Women'],
+            'timestamp': ['2025-06-15 10:00:00', '2025-06-15 10:00:00']
+        })
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'products.csv')
+            assert save_to_csv(df.iloc[:1], file_path, create_backup_flag=False) == True
+            with open(file_path + KEY_INDEX_SUFFIX, 'wb') as fh:
+                fh.write(sidecar_content)
+            
+            assert append_to_csv(df, file_path) == True
+            assert list(pd.read_csv(file_path)['title']) == ['Product 1', 'Product 2']
+            
+            # The rebuilt sidecar is readable again and no temporary file is left behind
+            assert append_to_csv(df, file_path) == True
+            assert len(pd.read_csv(file_path)) == 2
+            assert sorted(os.listdir(tmp_dir)) == ['products.csv', 'products.csv' + KEY_INDEX_SUFFIX]
+    
+    def test_append_to_csv_rebuilt_keys_match_prices_exactly(self):
+        """Test that keys re-read from the CSV match the hashed float prices"""
+        # Converted prices such as 1.23 * 16000 are not exact in binary floating point
+        prices = [cents / 100 * 16000 for cents in range(1, 501)]
+        df = pd.DataFrame({
+            'title': [f'Product {i}' for i in range(len(prices))],
+            'price': prices,
+            'rating': 4.5,
+            'colors': 3,
+            'size': 'M',
+            'gender': 'Men',
+            'timestamp': '2025-06-15 10:00:00'
+        })
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'products.csv')
+            
+            assert save_to_csv(df, file_path, create_backup_flag=False) == True
+            assert append_to_csv(df, file_path) == True
+            assert len(pd.read_csv(file_path)) == len(df)
     
     def test_generate_summary_report(self):
         """Test summary report generation"""
@@ -191,6 +375,31 @@ class TestLoad:
         assert 'avg_price' in summary['price_stats']
         assert 'rating_stats' in summary
         assert 'avg_rating' in summary['rating_stats']
+        
+        # Min/max of the integer colors column stay integers
+        assert summary['colors_stats']['min_colors'] == 2
+        assert summary['colors_stats']['max_colors'] == 3
+        assert isinstance(summary['colors_stats']['min_colors'], np.integer)
+        assert isinstance(summary['colors_stats']['max_colors'], np.integer)
+        assert summary['colors_stats']['avg_colors'] == pytest.approx(8 / 3)
+    
+    def test_generate_summary_report_categorical(self):
+        """Test distributions of categorical columns leave out unused categories"""
+        df = pd.DataFrame({
+            'title': ['T-shirt 1', 'Hoodie 1', 'T-shirt 2'],
+            'price': [415840.0, 735840.0, 495840.0],
+            'rating': [4.5, 3.8, 4.2],
+            'colors': [3, 2, 3],
+            'size': pd.Categorical(['M', 'L', 'M'], categories=['S', 'M', 'L'], ordered=True),
+            'gender': pd.Categorical(['Men', 'Women', 'Men'], categories=['Men', 'Women', 'Unisex']),
+            'timestamp': ['2025-06-15 10:00:00', '2025-06-15 10:00:00', '2025-06-15 10:00:00']
+        })
+        
+        summary = generate_summary_report(df)
+        
+        assert summary['size_distribution'] == {'M': 2, 'L': 1}
+        assert list(summary['size_distribution']) == ['M', 'L']
+        assert summary['gender_distribution'] == {'Men': 2, 'Women': 1}
     
     def test_generate_summary_report_empty(self):
         """Test summary report generation with empty dataframe"""
@@ -256,6 +465,35 @@ class TestLoad:
         finally:
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
+    
+    def test_load_fashion_data_parquet(self):
+        """Test main load function with Parquet output"""
+        df = pd.DataFrame({
+            'title': ['Product 1'],
+            'price': [415840.0],
+            'rating': [4.5],
+            'colors': [3],
+            'size': ['M'],
+            'gender': ['Men'],
+            'timestamp': ['2025-06-15 10:00:00']
+        })
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.parquet') as tmp_file:
+            tmp_path = tmp_file.name
+        
+        try:
+            result = load_fashion_data(df, tmp_path, mode="overwrite")
+            assert result == True
+            
+            loaded_df = pd.read_parquet(tmp_path)
+            pd.testing.assert_frame_equal(loaded_df, df)
+            
+            # Parquet files cannot be appended to
+            assert load_fashion_data(df, tmp_path, mode="append") == False
+            
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ Unit tests for the transform module
 
 import pytest
 import pandas as pd
+import json
 import sys
 import os
 
@@ -120,6 +121,50 @@ class TestTransform:
         assert row['gender'] == 'Unisex'
         assert row['timestamp'] == '2025-06-15 10:00:00'
     
+    def test_transform_fashion_data_compact_dtypes(self):
+        """Test size and gender are categorical and colors a small integer type"""
+        raw_data = [
+            {
+                'title': f'T-shirt {i}',
+                'price': '$25.99',
+                'rating': '⭐ 4.5 / 5',
+                'colors': '3',
+                'size': size,
+                'gender': 'Men',
+                'timestamp': '2025-06-15 10:00:00'
+            }
+            for i, size in enumerate(['XL', 'S', 'M'])
+        ]
+        
+        result = transform_fashion_data(raw_data)
+        
+        assert result['size'].cat.ordered
+        assert list(result['size'].cat.categories) == ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+        assert list(result['size'].sort_values()) == ['S', 'M', 'XL']
+        assert list(result['gender'].cat.categories) == ['Men', 'Women', 'Unisex']
+        assert pd.api.types.is_integer_dtype(result['colors'])
+        assert result['colors'].dtype.itemsize < 8
+    
+    def test_transform_fashion_data_colors_out_of_range(self):
+        """Test that huge color counts are dropped instead of being rounded or wrapped"""
+        raw_data = [
+            {
+                'title': f'T-shirt {i}',
+                'price': '$25.99',
+                'rating': '⭐ 4.5 / 5',
+                'colors': colors,
+                'size': 'M',
+                'gender': 'Men',
+                'timestamp': '2025-06-15 10:00:00'
+            }
+            for i, colors in enumerate(['99999999999999999999', '12345678901234567', '999999999999999', '0003'])
+        ]
+        
+        result = transform_fashion_data(raw_data)
+        
+        assert list(result['title']) == ['T-shirt 2', 'T-shirt 3']
+        assert list(result['colors']) == [clean_colors('999999999999999'), clean_colors('0003')]
+    
     def test_transform_fashion_data_multiple_products(self):
         """Test transformation with multiple products"""
         raw_data = [
@@ -154,6 +199,56 @@ class TestTransform:
         assert result.iloc[0]['price'] == 415840.0  # 25.99 * 16000
         assert result.iloc[1]['price'] == 2400000.0  # 150.00 * 16000
     
+    def test_transform_fashion_data_json_payload(self):
+        """Test transformation of raw data serialized as JSON bytes"""
+        raw_data = [
+            {
+                'title': 'T-shirt 1',
+                'price': '$25.99',
+                'rating': '⭐ 4.5 / 5',
+                'colors': '3',
+                'size': 'M',
+                'gender': 'Men',
+                'timestamp': '2025-06-15 10:00:00'
+            }
+        ]
+        
+        result = transform_fashion_data(json.dumps(raw_data).encode('utf-8'))
+        expected = transform_fashion_data(raw_data)
+        
+        pd.testing.assert_frame_equal(result, expected)
+        assert transform_fashion_data(b'[]').empty
+    
+    def test_transform_fashion_data_column_lists(self):
+        """Test transformation of raw data given as a dictionary of column lists"""
+        raw_data = [
+            {
+                'title': 'T-shirt 1',
+                'price': '$25.99',
+                'rating': '⭐ 4.5 / 5',
+                'colors': '3',
+                'size': 'M',
+                'gender': 'Men',
+                'timestamp': '2025-06-15 10:00:00'
+            },
+            {
+                'title': 'Unknown Product',
+                'price': 'Price Unavailable',
+                'rating': 'Invalid Rating',
+                'colors': '2',
+                'size': 'L',
+                'gender': 'Women',
+                'timestamp': '2025-06-15 10:00:00'
+            }
+        ]
+        columns = {key: [product[key] for product in raw_data] for key in raw_data[0]}
+        
+        result = transform_fashion_data(columns)
+        expected = transform_fashion_data(raw_data)
+        
+        pd.testing.assert_frame_equal(result, expected)
+        assert transform_fashion_data({'title': [], 'price': []}).empty
+    
     def test_transform_fashion_data_invalid_data(self):
         """Test transformation with invalid/missing data (should be filtered out)"""
         raw_data = [
@@ -201,6 +296,83 @@ class TestTransform:
         
         assert isinstance(result, pd.DataFrame)
         assert len(result) == 1  # Duplicate should be removed
+    
+    def test_transform_fashion_data_matches_cleaning_helpers(self):
+        """Test that the bulk transformation follows the same rules as the cleaning helpers"""
+        raw_data = [
+            {
+                'title': 'Jacket 1',
+                'price': '$1,234.56',
+                'rating': '⭐ 4.0 / 5',
+                'colors': ' 5 ',
+                'size': ' xl ',
+                'gender': 'women',
+                'timestamp': '2025-06-15 10:00:00'
+            },
+            {
+                'title': 'Jacket 2',
+                'price': '$50.00',
+                'rating': '⭐ Invalid Rating / 5',
+                'colors': '2',
+                'size': 'S',
+                'gender': 'Men',
+                'timestamp': '2025-06-15 10:00:00'
+            }
+        ]
+        
+        result = transform_fashion_data(raw_data)
+        
+        assert len(result) == 1
+        row = result.iloc[0]
+        assert row['price'] == clean_price('$1,234.56')
+        assert row['rating'] == clean_rating('⭐ 4.0 / 5')
+        assert row['colors'] == clean_colors(' 5 ')
+        assert row['size'] == standardize_size(' xl ')
+        assert row['gender'] == standardize_gender('women')
+    
+    def test_transform_fashion_data_numeric_and_mixed_values(self):
+        """Test that numeric cells (e.g. from JSON) are cleaned instead of failing"""
+        raw_data = [
+            {
+                'title': 'Jacket 1',
+                'price': 25.99,
+                'rating': 4.5,
+                'colors': 3,
+                'size': 'M',
+                'gender': 'Men',
+                'timestamp': '2025-06-15 10:00:00'
+            },
+            {
+                'title': 'Jacket 2',
+                'price': '$50.00',
+                'rating': '⭐ 4.0 / 5',
+                'colors': '3',
+                'size': 'L',
+                'gender': 'Women',
+                'timestamp': '2025-06-15 10:00:00'
+            },
+            {
+                'title': 'Jacket 3',
+                'price': 10,
+                'rating': 3.9,
+                'colors': 2.5,  # not a whole number of colors
+                'size': 'S',
+                'gender': 'Unisex',
+                'timestamp': '2025-06-15 10:00:00'
+            }
+        ]
+        
+        result = transform_fashion_data(raw_data)
+        
+        assert list(result['title']) == ['Jacket 1', 'Jacket 2']
+        assert list(result['price']) == [25.99 * 16000, clean_price('$50.00')]
+        assert list(result['rating']) == [4.5, clean_rating('⭐ 4.0 / 5')]
+        assert list(result['colors']) == [clean_colors(3), clean_colors('3')]
+        
+        # Numbers in a JSON payload are handled the same way
+        result = transform_fashion_data(json.dumps(raw_data[:1]).encode('utf-8'))
+        assert list(result['colors']) == [3]
+        assert list(result['price']) == [25.99 * 16000]
 
 
 if __name__ == "__main__":
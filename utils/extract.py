@@ -3,30 +3,170 @@ Extract module for Fashion Studio ETL Pipeline
 This module handles data extraction from the Fashion Studio website
 """
 
+import asyncio
+import atexit
+import hashlib
+import json
+import os
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from selectolax.lexbor import LexborHTMLParser
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional, fall back to threads over fetch_webpage
+    aiohttp = None
+
+# Maximum number of pages fetched at the same time
+MAX_CONCURRENT_REQUESTS = 10
+
+# Keep-alive connections held open per host, one for every concurrent request
+CONNECTION_POOL_SIZE = MAX_CONCURRENT_REQUESTS
+
+# Retry policy for failed requests (exponential back-off: 0.3s, 0.6s, 1.2s)
+MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Product detail paragraphs (rating, colors, size, gender) are marked by this inline style
+DETAIL_STYLE = 'font-size: 14px'
+_DETAIL_SELECTOR = f'p[style*="{DETAIL_STYLE}"]'
+
+# Detail paragraphs of the form "<Label>: <value>" and the product field they fill
+_DETAIL_FIELDS = {'Rating': 'rating', 'Size': 'size', 'Gender': 'gender'}
+
+# Precompiled pattern for the "<n> Colors" detail paragraph
+_COLORS_RE = re.compile(r'(\d+)\s+Colors')
+
+# Directory where fetched pages are kept for conditional (ETag / Last-Modified) requests
+HTTP_CACHE_DIR = '.http_cache'
+
+
+def _create_session() -> requests.Session:
+    """
+    Create a requests session that keeps connections alive between calls
+    
+    Returns:
+        requests.Session: Session with a pooled, retrying HTTP adapter mounted
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    
+    retries = Retry(total=MAX_RETRIES, backoff_factor=RETRY_BACKOFF_FACTOR,
+                    status_forcelist=RETRY_STATUS_CODES)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CONNECTION_POOL_SIZE, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    
+    return session
+
+
+# Shared session so fetch_webpage reuses TCP/TLS connections across pages
+_SESSION = _create_session()
+atexit.register(_SESSION.close)
+
+
+def _cache_paths(url: str) -> Tuple[str, str]:
+    """
+    Get the cache file paths (body, validators) for the given URL
+    
+    Args:
+        url (str): The page URL
+        
+    Returns:
+        Tuple[str, str]: Path of the cached HTML body and of its validators
+    """
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return (os.path.join(HTTP_CACHE_DIR, f"{key}.html"),
+            os.path.join(HTTP_CACHE_DIR, f"{key}.json"))
+
+
+def _load_cached_page(url: str) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Load the cached copy of a page and build conditional request headers for it
+    
+    Args:
+        url (str): The page URL
+        
+    Returns:
+        Tuple[Dict[str, str], Optional[str]]: Conditional headers and cached HTML
+        content, or an empty dict and None if the page is not cached
+    """
+    body_path, validators_path = _cache_paths(url)
+    try:
+        with open(validators_path, encoding='utf-8') as f:
+            validators = json.load(f)
+        with open(body_path, encoding='utf-8') as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return {}, None
+    
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers, body
+
+
+def _store_cached_page(url: str, response_headers, body: str) -> None:
+    """
+    Cache a fetched page if the server sent ETag or Last-Modified validators
+    
+    Args:
+        url (str): The page URL
+        response_headers: Response headers (case-insensitive mapping)
+        body (str): HTML content of the page
+    """
+    validators = {
+        'etag': response_headers.get('ETag'),
+        'last_modified': response_headers.get('Last-Modified')
+    }
+    if not any(validators.values()):
+        return
+    
+    body_path, validators_path = _cache_paths(url)
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        with open(body_path, 'w', encoding='utf-8') as f:
+            f.write(body)
+        with open(validators_path, 'w', encoding='utf-8') as f:
+            json.dump(validators, f)
+    except OSError as e:
+        print(f"Warning: Could not cache webpage {url}: {e}")
 
 
 def fetch_webpage(url: str) -> Optional[str]:
     """
     Fetch HTML content from the given URL
     
+    Pages fetched before are requested conditionally and served from
+    HTTP_CACHE_DIR when the server answers 304 Not Modified.
+    
     Args:
         url (str): The URL to fetch
         
     Returns:
         Optional[str]: HTML content if successful, None otherwise
     """
+    conditional_headers, cached_body = _load_cached_page(url)
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
+        response = _SESSION.get(url, headers=conditional_headers, timeout=10)
+        if response.status_code == 304 and cached_body is not None:
+            return cached_body
         response.raise_for_status()
+        _store_cached_page(url, response.headers, response.text)
         return response.text
     except requests.RequestException as e:
         print(f"Error fetching webpage: {e}")
@@ -47,29 +187,30 @@ def parse_product_data(html_content: str, timestamp: str) -> List[Dict[str, str]
     if not html_content:
         return []
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    tree = LexborHTMLParser(html_content)
     products = []
     
     # Find all product cards
-    product_cards = soup.find_all('div', class_='collection-card')
+    product_cards = tree.css('div.collection-card')
     
     for card in product_cards:
         product = {}
         
         # Extract product title (name)
-        title_element = card.find('h3', class_='product-title')
-        product['title'] = title_element.text.strip() if title_element else 'Unknown'
+        title_element = card.css_first('h3.product-title')
+        product['title'] = title_element.text().strip() if title_element else 'Unknown'
         
         # Extract price
-        price_element = card.find('span', class_='price')
+        price_element = card.css_first('span.price')
         if price_element:
-            price_text = price_element.text.strip()
+            price_text = price_element.text().strip()
             product['price'] = price_text
         else:
             product['price'] = 'Price Unavailable'
         
         # Extract rating, colors, size, and gender from paragraph elements
-        detail_paragraphs = card.find_all('p', style=lambda value: value and 'font-size: 14px' in value)
+        # (filtered by the selector engine, not attribute by attribute in Python)
+        detail_paragraphs = card.css(_DETAIL_SELECTOR)
         
         product['rating'] = 'Not Rated'
         product['colors'] = '0'
@@ -77,16 +218,15 @@ def parse_product_data(html_content: str, timestamp: str) -> List[Dict[str, str]
         product['gender'] = 'Unknown'
         
         for p in detail_paragraphs:
-            text = p.text.strip()
-            if text.startswith('Rating:'):
-                product['rating'] = text.replace('Rating: ', '').strip()
+            text = p.text().strip()
+            # Split off the label once and look up the field it belongs to
+            label, _, value = text.partition(':')
+            field = _DETAIL_FIELDS.get(label)
+            if field is not None:
+                product[field] = value.strip()
             elif 'Colors' in text:
-                colors_match = re.search(r'(\d+)\s+Colors', text)
+                colors_match = _COLORS_RE.search(text)
                 product['colors'] = colors_match.group(1) if colors_match else '0'
-            elif text.startswith('Size:'):
-                product['size'] = text.replace('Size: ', '').strip()
-            elif text.startswith('Gender:'):
-                product['gender'] = text.replace('Gender: ', '').strip()
         
         # Add timestamp
         product['timestamp'] = timestamp
@@ -96,11 +236,92 @@ def parse_product_data(html_content: str, timestamp: str) -> List[Dict[str, str]
     return products
 
 
+def _parse_page(html_content: Optional[str], timestamp: str) -> Optional[List[Dict[str, str]]]:
+    """
+    Parse one fetched page in a worker process
+    
+    Args:
+        html_content (Optional[str]): HTML content, None if the fetch failed
+        timestamp (str): Extraction timestamp
+        
+    Returns:
+        Optional[List[Dict[str, str]]]: List of product dictionaries, None if the fetch failed
+    """
+    if not html_content:
+        return None
+    return parse_product_data(html_content, timestamp)
+
+
+async def _fetch_all(urls: List[str]) -> List[Optional[str]]:
+    """
+    Fetch HTML content from all given URLs concurrently
+    
+    Connection errors, timeouts and RETRY_STATUS_CODES responses are retried
+    up to MAX_RETRIES times with exponential back-off.
+    
+    Args:
+        urls (List[str]): The URLs to fetch
+        
+    Returns:
+        List[Optional[str]]: HTML content for each URL (in the same order), None for failed fetches
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    timeout = aiohttp.ClientTimeout(total=10)
+    connector = aiohttp.TCPConnector(limit=CONNECTION_POOL_SIZE, ttl_dns_cache=300)
+    
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+        
+        async def _fetch(url: str, sem: asyncio.Semaphore) -> Optional[str]:
+            conditional_headers, cached_body = _load_cached_page(url)
+            for attempt in range(MAX_RETRIES + 1):
+                if attempt:
+                    # Back off without holding a concurrency slot
+                    await asyncio.sleep(RETRY_BACKOFF_FACTOR * 2 ** (attempt - 1))
+                try:
+                    async with sem, session.get(url, headers=conditional_headers, timeout=timeout) as response:
+                        if response.status in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+                            continue
+                        if response.status == 304 and cached_body is not None:
+                            return cached_body
+                        response.raise_for_status()
+                        # Decode leniently, like requests' .text
+                        body = await response.text(errors='replace')
+                        _store_cached_page(url, response.headers, body)
+                        return body
+                except aiohttp.ClientResponseError as e:
+                    print(f"Error fetching webpage {url}: {e}")
+                    return None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == MAX_RETRIES:
+                        print(f"Error fetching webpage {url}: {e}")
+                        return None
+        
+        results = await asyncio.gather(
+            *(_fetch(url, semaphore) for url in urls), return_exceptions=True
+        )
+    
+    # An unexpected error on one page must not abort the other fetches
+    pages_html = []
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            print(f"Error fetching webpage {url}: {result}")
+            result = None
+        elif isinstance(result, BaseException):
+            raise result
+        pages_html.append(result)
+    return pages_html
+
+
 def extract_fashion_data(base_url: str = "https://fashion-studio.dicoding.dev/", 
                        max_pages: int = 50) -> List[Dict[str, str]]:
     """
     Main extraction function to get fashion product data from all pages
     
+    Pages are fetched concurrently (at most MAX_CONCURRENT_REQUESTS at a time)
+    with aiohttp, or with a thread pool over fetch_webpage when aiohttp is not
+    installed. The fetched pages are parsed in parallel worker processes and
+    collected in page order.
+    
     Args:
         base_url (str): Base URL of the fashion website
         max_pages (int): Maximum number of pages to scrape (1-50)
@@ -111,41 +332,56 @@ def extract_fashion_data(base_url: str = "https://fashion-studio.dicoding.dev/",
     print(f"Extracting data from: {base_url}")
     print(f"Scraping pages 1 to {max_pages}")
     
-    all_products = []
     extraction_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    for page in range(1, max_pages + 1):
-        # Construct URL for each page
-        if page == 1:
-            page_url = base_url
-        else:
-            # Remove trailing slash if present and add page number
-            base_clean = base_url.rstrip('/')
-            page_url = f"{base_clean}/page{page}"
-        
+    # Construct URL for each page
+    base_clean = base_url.rstrip('/')
+    page_urls = [
+        base_url if page == 1 else f"{base_clean}/page{page}"
+        for page in range(1, max_pages + 1)
+    ]
+    
+    # Fetch all pages concurrently
+    if aiohttp is not None:
+        pages_html = asyncio.run(_fetch_all(page_urls))
+    else:
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            pages_html = list(executor.map(fetch_webpage, page_urls))
+    
+    # Parse product data on all CPU cores, one result slot per page
+    parse_page = partial(_parse_page, timestamp=extraction_timestamp)
+    workers = min(os.cpu_count() or 1, len(pages_html))
+    if workers > 1:
+        # Hand out pages in batches to cut per-task pickling round trips
+        chunksize = max(1, len(pages_html) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed_pages = list(executor.map(parse_page, pages_html, chunksize=chunksize))
+    else:
+        # Not worth starting worker processes for a single page
+        parsed_pages = list(map(parse_page, pages_html))
+    
+    scraped_pages = 0
+    for page, page_products in enumerate(parsed_pages, start=1):
         print(f"Scraping page {page}... ", end="")
+        scraped_pages = page
         
-        # Fetch webpage content
-        html_content = fetch_webpage(page_url)
-        if not html_content:
+        if page_products is None:
             print(f"Failed to fetch page {page}")
             continue
         
-        # Parse product data
-        page_products = parse_product_data(html_content, extraction_timestamp)
-        
         if not page_products:
             print(f"No products found on page {page}")
             # If no products found, we might have reached the end
             break
         
-        all_products.extend(page_products)
         print(f"Found {len(page_products)} products")
-        
-        # Add small delay to be respectful to the server
-        time.sleep(0.5)
     
-    print(f"Successfully extracted {len(all_products)} products from {page} pages")
+    # Flatten the per-page results in a single pass
+    all_products = list(chain.from_iterable(
+        page_products for page_products in parsed_pages[:scraped_pages] if page_products
+    ))
+    
+    print(f"Successfully extracted {len(all_products)} products from {scraped_pages} pages")
     return all_products
 
 
@@ -3,11 +3,36 @@ Load module for Fashion Studio ETL Pipeline
 This module handles data loading and storage operations
 """
 
+import numpy as np
 import pandas as pd
 import os
+import shutil
+import zipfile
 from typing import Optional
 from datetime import datetime
 
+try:
+    from utils.transform import DEDUP_KEY_COLUMNS
+except ImportError:  # run as a script from inside utils/
+    from transform import DEDUP_KEY_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # PyArrow is optional, fall back to the pandas CSV writer
+    pa = None
+    pacsv = None
+
+# Output files are written through a 1 MiB buffer to keep the number of write syscalls low
+CSV_WRITE_BUFFER_SIZE = 1 << 20
+
+# Rows converted and written per batch, bounding memory used by the CSV writers
+CSV_WRITE_CHUNK_ROWS = 10000
+
+# Suffix of the sidecar file holding the key hashes of rows already in a CSV file,
+# together with the size and modification time of the CSV file they describe
+KEY_INDEX_SUFFIX = '.keys.npz'
+
 
 def validate_dataframe(df: pd.DataFrame) -> bool:
     """
@@ -33,6 +58,39 @@ def validate_dataframe(df: pd.DataFrame) -> bool:
     return True
 
 
+def write_csv(df: pd.DataFrame, file_path: str, append: bool = False) -> None:
+    """
+    Write DataFrame to a CSV file, using the PyArrow CSV writer when available
+    
+    Args:
+        df (pd.DataFrame): DataFrame to write
+        file_path (str): Path of the CSV file
+        append (bool): Append rows to the end of the file instead of overwriting it.
+            The header is only written when the file is new or empty.
+    """
+    if append:
+        include_header = not os.path.exists(file_path) or os.path.getsize(file_path) == 0
+    else:
+        include_header = True
+        # The keys in the sidecar file describe the rows being replaced
+        index_path = file_path + KEY_INDEX_SUFFIX
+        if os.path.exists(index_path):
+            os.remove(index_path)
+    
+    with open(file_path, 'ab' if append else 'wb', buffering=CSV_WRITE_BUFFER_SIZE) as fh:
+        if pacsv is not None:
+            # Convert one batch of rows at a time instead of the whole DataFrame
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            write_options = pacsv.WriteOptions(include_header=include_header)
+            with pacsv.CSVWriter(fh, schema, write_options=write_options) as writer:
+                for start in range(0, len(df), CSV_WRITE_CHUNK_ROWS):
+                    chunk = df.iloc[start:start + CSV_WRITE_CHUNK_ROWS]
+                    writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+        else:
+            df.to_csv(fh, index=False, header=include_header, encoding='utf-8',
+                      chunksize=CSV_WRITE_CHUNK_ROWS)
+
+
 def create_backup(file_path: str) -> bool:
     """
     Create backup of existing file
@@ -50,9 +108,9 @@ def create_backup(file_path: str) -> bool:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_path = f"{file_path}.backup_{timestamp}"
         
-        # Read and write to create backup
-        df = pd.read_csv(file_path)
-        df.to_csv(backup_path, index=False)
+        # Byte-level copy that keeps the original modification time;
+        # shutil uses os.sendfile on Linux so the data stays in the kernel
+        shutil.copy2(file_path, backup_path)
         
         print(f"Backup created: {backup_path}")
         return True
@@ -61,7 +119,8 @@ def create_backup(file_path: str) -> bool:
         return False
 
 
-def save_to_csv(df: pd.DataFrame, file_path: str, create_backup_flag: bool = True) -> bool:
+def save_to_csv(df: pd.DataFrame, file_path: str, create_backup_flag: bool = True,
+                validated: bool = False) -> bool:
     """
     Save DataFrame to CSV file
     
@@ -69,13 +128,14 @@ def save_to_csv(df: pd.DataFrame, file_path: str, create_backup_flag: bool = Tru
         df (pd.DataFrame): DataFrame to save
         file_path (str): Path where to save the CSV file
         create_backup_flag (bool): Whether to create backup of existing file
+        validated (bool): Skip validation because the caller already validated df
         
     Returns:
         bool: True if saved successfully, False otherwise
     """
     try:
         # Validate DataFrame
-        if not validate_dataframe(df):
+        if not validated and not validate_dataframe(df):
             return False
         
         # Create backup if requested and file exists
@@ -88,7 +148,7 @@ def save_to_csv(df: pd.DataFrame, file_path: str, create_backup_flag: bool = Tru
             os.makedirs(dir_path, exist_ok=True)
         
         # Save to CSV
-        df.to_csv(file_path, index=False, encoding='utf-8')
+        write_csv(df, file_path)
         
         print(f"Data successfully saved to: {file_path}")
         print(f"Total records saved: {len(df)}")
@@ -100,44 +160,130 @@ def save_to_csv(df: pd.DataFrame, file_path: str, create_backup_flag: bool = Tru
         return False
 
 
-def append_to_csv(df: pd.DataFrame, file_path: str) -> bool:
+def key_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Compute a stable 64-bit hash of the key columns for each row
+    
+    Args:
+        df (pd.DataFrame): DataFrame with the DEDUP_KEY_COLUMNS columns
+        
+    Returns:
+        np.ndarray: uint64 hash per row
+    """
+    return pd.util.hash_pandas_object(df[DEDUP_KEY_COLUMNS], index=False).to_numpy()
+
+
+def load_key_index(file_path: str) -> np.ndarray:
+    """
+    Load the key hashes of the rows in a CSV file
+    
+    The hashes are read from the sidecar file next to the CSV file. If the
+    sidecar is missing, or the CSV file's size or modification time differs from
+    the ones recorded in it (e.g. the CSV was overwritten or restored from a
+    backup), they are rebuilt from the key columns of the CSV file.
+    
+    Args:
+        file_path (str): Path to the CSV file
+        
+    Returns:
+        np.ndarray: Sorted uint64 key hashes, one per row in the CSV file
+    """
+    index_path = file_path + KEY_INDEX_SUFFIX
+    if os.path.exists(index_path):
+        csv_stat = os.stat(file_path)
+        try:
+            with np.load(index_path) as index:
+                if (int(index['csv_size']) == csv_stat.st_size
+                        and int(index['csv_mtime_ns']) == csv_stat.st_mtime_ns):
+                    return index['hashes']
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            # The sidecar is only a cache, rebuild it from the CSV file
+            print(f"Warning: Ignoring unreadable key index {index_path}: {e}")
+    
+    existing_keys = pd.read_csv(
+        file_path,
+        usecols=DEDUP_KEY_COLUMNS,
+        dtype={'title': str, 'price': float, 'size': str, 'gender': str},
+        # Prices must parse back to the exact floats that were hashed
+        float_precision='round_trip'
+    )
+    return np.sort(key_hashes(existing_keys))
+
+
+def save_key_index(file_path: str, hashes: np.ndarray) -> None:
+    """
+    Save the key hashes of the rows in a CSV file to its sidecar file
+    
+    The current size and modification time of the CSV file are stored with the
+    hashes, so any later change to the file invalidates them.
+    
+    Args:
+        file_path (str): Path to the CSV file
+        hashes (np.ndarray): Sorted uint64 key hashes, one per row in the CSV file
+    """
+    csv_stat = os.stat(file_path)
+    index_path = file_path + KEY_INDEX_SUFFIX
+    
+    # Write to a temporary file first so an interrupted save never leaves a partial sidecar
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as fh:
+        np.savez(fh, hashes=hashes, csv_size=csv_stat.st_size, csv_mtime_ns=csv_stat.st_mtime_ns)
+    os.replace(tmp_path, index_path)
+
+
+def append_to_csv(df: pd.DataFrame, file_path: str, validated: bool = False) -> bool:
     """
     Append DataFrame to existing CSV file
     
+    New rows are written to the end of the file without rewriting the existing
+    data. Rows whose key (title, price, size, gender) is already present in the
+    file are skipped; the keys in the file are tracked in a sidecar file
+    (KEY_INDEX_SUFFIX) so the existing data does not have to be read again.
+    
     Args:
         df (pd.DataFrame): DataFrame to append
         file_path (str): Path to the CSV file
+        validated (bool): Skip validation because the caller already validated df
         
     Returns:
         bool: True if appended successfully, False otherwise
     """
     try:
         # Validate DataFrame
-        if not validate_dataframe(df):
+        if not validated and not validate_dataframe(df):
             return False
         
-        if os.path.exists(file_path):
-            # Read existing data
-            existing_df = pd.read_csv(file_path)
+        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+            # Only the header of the existing file and its key hashes are needed
+            existing_columns = pd.read_csv(file_path, nrows=0).columns
+            existing_hashes = load_key_index(file_path)
             
-            # Combine data
-            combined_df = pd.concat([existing_df, df], ignore_index=True)
+            # Remove duplicates based on key columns, looking each new key up
+            # in the sorted existing keys with a binary search
+            new_hashes = key_hashes(df)
+            positions = np.searchsorted(existing_hashes, new_hashes)
+            if len(existing_hashes):
+                in_file = existing_hashes[np.minimum(positions, len(existing_hashes) - 1)] == new_hashes
+            else:
+                in_file = np.zeros(len(new_hashes), dtype=bool)
+            is_new = ~in_file & ~pd.Series(new_hashes).duplicated(keep='last').to_numpy()
+            new_rows = df[is_new].reindex(columns=existing_columns)
             
-            # Remove duplicates based on key columns
-            combined_df = combined_df.drop_duplicates(
-                subset=['title', 'price', 'size', 'gender'], 
-                keep='last'
-            )
+            # Append new rows in the column order of the existing file
+            write_csv(new_rows, file_path, append=True)
             
-            # Save combined data
-            combined_df.to_csv(file_path, index=False, encoding='utf-8')
+            # Merge the appended keys into the index, keeping it sorted
+            order = np.argsort(new_hashes[is_new], kind='stable')
+            save_key_index(file_path, np.insert(
+                existing_hashes, positions[is_new][order], new_hashes[is_new][order]
+            ))
             
             print(f"Data appended to: {file_path}")
-            print(f"Total records after append: {len(combined_df)}")
+            print(f"Total records after append: {len(existing_hashes) + len(new_rows)}")
             
         else:
             # File doesn't exist, create new
-            return save_to_csv(df, file_path, create_backup_flag=False)
+            return save_to_csv(df, file_path, create_backup_flag=False, validated=True)
         
         return True
         
@@ -146,6 +292,41 @@ def append_to_csv(df: pd.DataFrame, file_path: str) -> bool:
         return False
 
 
+def save_to_parquet(df: pd.DataFrame, file_path: str, validated: bool = False) -> bool:
+    """
+    Save DataFrame to a Parquet file (snappy compressed)
+    
+    Args:
+        df (pd.DataFrame): DataFrame to save
+        file_path (str): Path where to save the Parquet file
+        validated (bool): Skip validation because the caller already validated df
+        
+    Returns:
+        bool: True if saved successfully, False otherwise
+    """
+    try:
+        # Validate DataFrame
+        if not validated and not validate_dataframe(df):
+            return False
+        
+        # Ensure directory exists
+        dir_path = os.path.dirname(file_path)
+        if dir_path:  # Only create directory if there is a directory path
+            os.makedirs(dir_path, exist_ok=True)
+        
+        # Save to Parquet
+        df.to_parquet(file_path, engine='pyarrow', compression='snappy', index=False)
+        
+        print(f"Data successfully saved to: {file_path}")
+        print(f"Total records saved: {len(df)}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"Error saving data to Parquet: {e}")
+        return False
+
+
 def generate_summary_report(df: pd.DataFrame) -> dict:
     """
     Generate summary report of the loaded data
@@ -159,24 +340,52 @@ def generate_summary_report(df: pd.DataFrame) -> dict:
     if df.empty:
         return {}
     
+    # Compute min/max/mean of all numeric columns in a single aggregation
+    stat_columns = [col for col in ('price', 'rating', 'colors') if col in df.columns]
+    stats = df.agg({col: ['min', 'max', 'mean'] for col in stat_columns}).to_dict() if stat_columns else {}
+    
+    def get_stat(col: str, stat: str):
+        if col not in stats:
+            return 0
+        value = stats[col][stat]
+        # The aggregation result is float; min/max of an integer column are integers
+        if stat in ('min', 'max') and pd.api.types.is_integer_dtype(df[col]):
+            return df[col].dtype.type(value)
+        return value
+    
+    def get_distribution(col: str) -> dict:
+        if col not in df.columns:
+            return {}
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Count the integer category codes directly (-1 marks missing values)
+            codes = df[col].cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(df[col].cat.categories))
+            distribution = {
+                category: int(count)
+                for category, count in zip(df[col].cat.categories, counts) if count
+            }
+            # Most frequent first, like value_counts
+            return dict(sorted(distribution.items(), key=lambda item: item[1], reverse=True))
+        return df[col].value_counts().to_dict()
+    
     summary = {
         'total_products': len(df),
         'price_stats': {
-            'min_price': df['price'].min() if 'price' in df.columns else 0,
-            'max_price': df['price'].max() if 'price' in df.columns else 0,
-            'avg_price': df['price'].mean() if 'price' in df.columns else 0
+            'min_price': get_stat('price', 'min'),
+            'max_price': get_stat('price', 'max'),
+            'avg_price': get_stat('price', 'mean')
         },
         'rating_stats': {
-            'min_rating': df['rating'].min() if 'rating' in df.columns else 0,
-            'max_rating': df['rating'].max() if 'rating' in df.columns else 0,
-            'avg_rating': df['rating'].mean() if 'rating' in df.columns else 0
+            'min_rating': get_stat('rating', 'min'),
+            'max_rating': get_stat('rating', 'max'),
+            'avg_rating': get_stat('rating', 'mean')
         },
-        'gender_distribution': df['gender'].value_counts().to_dict() if 'gender' in df.columns else {},
-        'size_distribution': df['size'].value_counts().to_dict() if 'size' in df.columns else {},
+        'gender_distribution': get_distribution('gender'),
+        'size_distribution': get_distribution('size'),
         'colors_stats': {
-            'min_colors': df['colors'].min() if 'colors' in df.columns else 0,
-            'max_colors': df['colors'].max() if 'colors' in df.columns else 0,
-            'avg_colors': df['colors'].mean() if 'colors' in df.columns else 0
+            'min_colors': get_stat('colors', 'min'),
+            'max_colors': get_stat('colors', 'max'),
+            'avg_colors': get_stat('colors', 'mean')
         }
     }
     
@@ -190,8 +399,8 @@ def load_fashion_data(df: pd.DataFrame, output_path: str = "products.csv",
     
     Args:
         df (pd.DataFrame): Transformed data to load
-        output_path (str): Output file path
-        mode (str): Loading mode - 'overwrite' or 'append'
+        output_path (str): Output file path (.csv, or .parquet for Parquet output)
+        mode (str): Loading mode - 'overwrite' or 'append' (CSV only)
         
     Returns:
         bool: True if loaded successfully, False otherwise
@@ -199,10 +408,20 @@ def load_fashion_data(df: pd.DataFrame, output_path: str = "products.csv",
     print(f"Loading data to: {output_path}")
     print(f"Mode: {mode}")
     
-    if mode == "append":
-        success = append_to_csv(df, output_path)
+    # Validate once here, the writers below can then skip it
+    if not validate_dataframe(df):
+        return False
+    
+    if output_path.endswith('.parquet'):
+        if mode == "append":
+            print("Error: Append mode is not supported for Parquet output")
+            success = False
+        else:
+            success = save_to_parquet(df, output_path, validated=True)
+    elif mode == "append":
+        success = append_to_csv(df, output_path, validated=True)
     else:
-        success = save_to_csv(df, output_path)
+        success = save_to_csv(df, output_path, validated=True)
     
     if success:
         # Generate and print summary report
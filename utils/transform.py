@@ -5,12 +5,50 @@ This module handles data transformation and cleaning
 
 import pandas as pd
 import re
-from typing import List, Dict, Any
+import json
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Union
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library decoder
+    orjson = None
+
 # Exchange rate USD to IDR
 USD_TO_IDR_RATE = 16000
 
+# Precompiled patterns shared by the cleaning helpers and the vectorized
+# transformation (each captures the value in group 1)
+_PRICE_RE = re.compile(r'(\d+\.?\d*)')  # applied after removing thousands separators
+_RATING_RE = re.compile(r'(\d+\.?\d*)\s*/\s*\d+')
+_INTEGER_RE = re.compile(r'^\s*([+-]?\d+)\s*$')
+
+# Numbers of colors from this value up are treated as invalid; every count below it
+# is held exactly while parsed as float, so no value is rounded or wrapped around
+_COLORS_LIMIT = 10 ** 15
+
+# Columns of the raw extracted product records
+SCHEMA_COLUMNS = ('title', 'price', 'rating', 'colors', 'size', 'gender', 'timestamp')
+
+# Accepted values for the standardized size and gender columns
+VALID_SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+VALID_GENDERS = ["Men", "Women", "Unisex"]
+
+# Upper-cased raw value -> standardized value
+SIZE_MAPPING = {size: size for size in VALID_SIZES}
+GENDER_MAPPING = {gender.upper(): gender for gender in VALID_GENDERS}
+
+# Categorical dtypes of the cleaned size and gender columns (sizes in size order)
+SIZE_DTYPE = pd.CategoricalDtype(VALID_SIZES, ordered=True)
+GENDER_DTYPE = pd.CategoricalDtype(VALID_GENDERS)
+
+# Placeholder titles that do not identify a real product
+INVALID_TITLES = frozenset({"unknown product", "unknown", ""})
+
+# Columns that identify a product when removing duplicates
+DEDUP_KEY_COLUMNS = ['title', 'price', 'size', 'gender']
+
 
 def clean_price(price_str: str) -> float:
     """
@@ -26,9 +64,9 @@ def clean_price(price_str: str) -> float:
         return 0.0
     
     # Remove currency symbols and extract numeric value
-    price_match = re.search(r'[\d,]+\.?\d*', price_str.replace(',', ''))
+    price_match = _PRICE_RE.search(price_str.replace(',', ''))
     if price_match:
-        usd_price = float(price_match.group())
+        usd_price = float(price_match.group(1))
         # Convert USD to IDR
         return usd_price * USD_TO_IDR_RATE
     return 0.0
@@ -52,7 +90,7 @@ def clean_rating(rating_str: str) -> float:
         return None
     
     # Extract rating score (e.g., "⭐ 4.5 / 5")
-    rating_match = re.search(r'(\d+\.?\d*)\s*/\s*(\d+)', rating_str)
+    rating_match = _RATING_RE.search(rating_str)
     if rating_match:
         return float(rating_match.group(1))
     
@@ -78,6 +116,7 @@ def clean_colors(colors_str: str) -> int:
         return None
 
 
+@lru_cache(maxsize=128)
 def standardize_size(size_str: str) -> str:
     """
     Standardize size values (size only, no "Size:" prefix)
@@ -91,19 +130,11 @@ def standardize_size(size_str: str) -> str:
     if not size_str or size_str == "Unknown":
         return None
     
-    size_mapping = {
-        "XS": "XS",
-        "S": "S", 
-        "M": "M",
-        "L": "L",
-        "XL": "XL",
-        "XXL": "XXL"
-    }
-    
     clean_size = size_str.upper().strip()
-    return size_mapping.get(clean_size, None)
+    return SIZE_MAPPING.get(clean_size, None)
 
 
+@lru_cache(maxsize=128)
 def standardize_gender(gender_str: str) -> str:
     """
     Standardize gender values (gender only, no "Gender:" prefix)
@@ -117,14 +148,8 @@ def standardize_gender(gender_str: str) -> str:
     if not gender_str or gender_str == "Unknown":
         return None
     
-    gender_mapping = {
-        "MEN": "Men",
-        "WOMEN": "Women",
-        "UNISEX": "Unisex"
-    }
-    
     clean_gender = gender_str.upper().strip()
-    return gender_mapping.get(clean_gender, None)
+    return GENDER_MAPPING.get(clean_gender, None)
 
 
 def is_valid_title(title: str) -> bool:
@@ -140,56 +165,126 @@ def is_valid_title(title: str) -> bool:
     if not title:
         return False
     
-    invalid_titles = ["unknown product", "unknown", ""]
-    return title.lower().strip() not in invalid_titles
+    return title.lower().strip() not in INVALID_TITLES
+
+
+def _split_text_and_numbers(column: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Split a raw column into its string cells and its numeric cells
+    
+    Records decoded from JSON may hold numbers where the scraper produces
+    strings. Cells of the other kind are NaN in each part, so the .str
+    accessor can always be used on the string part.
+    
+    Args:
+        column (pd.Series): Raw column
+        
+    Returns:
+        Tuple[pd.Series, pd.Series]: String cells (object dtype) and numeric cells (float)
+    """
+    if pd.api.types.infer_dtype(column, skipna=True) in ('string', 'empty'):
+        # Usual case, only strings and missing values
+        return column.astype(object, copy=False), pd.Series(float('nan'), index=column.index)
+    
+    is_text = column.map(type).eq(str)
+    text = column.where(is_text).astype(object)
+    numbers = pd.to_numeric(column.mask(is_text), errors='coerce')
+    return text, numbers
 
 
-def transform_fashion_data(raw_data: List[Dict[str, str]]) -> pd.DataFrame:
+def transform_fashion_data(raw_data: Union[List[Dict[str, str]], Dict[str, List[str]], bytes, str]) -> pd.DataFrame:
     """
     Main transformation function to clean and process fashion data
     
     Args:
-        raw_data (List[Dict[str, str]]): Raw extracted data
+        raw_data (Union[List[Dict[str, str]], Dict[str, List[str]], bytes, str]): Raw
+            extracted data, either as a list of product dictionaries, as a dictionary
+            of column lists, or serialized as JSON in one of those shapes
         
     Returns:
         pd.DataFrame: Transformed and cleaned data
     """
-    if not raw_data:
+    if isinstance(raw_data, (bytes, str)):
+        raw_data = orjson.loads(raw_data) if orjson is not None else json.loads(raw_data)
+    
+    if isinstance(raw_data, dict):
+        num_products = max((len(values) for values in raw_data.values()), default=0)
+    else:
+        num_products = len(raw_data)
+    
+    if not num_products:
         print("No data to transform")
         return pd.DataFrame()
     
-    print(f"Transforming {len(raw_data)} products...")
+    print(f"Transforming {num_products} products...")
+    
+    # Convert to DataFrame with the known schema, no need to infer columns from every record;
+    # column lists are used as they are, without going through per-row dictionaries
+    if isinstance(raw_data, dict):
+        df = pd.DataFrame(raw_data, columns=SCHEMA_COLUMNS)
+    else:
+        df = pd.DataFrame.from_records(raw_data, columns=SCHEMA_COLUMNS)
+    
+    # Clean and transform each field with vectorized string operations
+    # (strings follow the same rules as clean_price, clean_rating, clean_colors,
+    # standardize_size and standardize_gender; numeric cells are taken as the
+    # USD price, the rating score and, if integral, the number of colors)
+    price_text, price_numbers = _split_text_and_numbers(df['price'])
+    usd_prices = (
+        price_text.str.replace(',', '', regex=False)
+        .str.extract(_PRICE_RE, expand=False)
+        .astype(float)
+        .fillna(price_numbers)
+    )
+    df['price'] = (usd_prices * USD_TO_IDR_RATE).fillna(0.0)
+    
+    rating_text, rating_numbers = _split_text_and_numbers(df['rating'])
+    ratings = rating_text.str.extract(_RATING_RE, expand=False).astype(float)
+    ratings = ratings.mask(rating_text.str.contains('Invalid Rating', regex=False, na=False))
+    df['rating'] = ratings.fillna(rating_numbers)
     
-    # Convert to DataFrame
-    df = pd.DataFrame(raw_data)
+    colors_text, colors_numbers = _split_text_and_numbers(df['colors'])
+    colors = (
+        colors_text.str.extract(_INTEGER_RE, expand=False).astype(float)
+        .fillna(colors_numbers.where(colors_numbers % 1 == 0))
+    )
+    df['colors'] = colors.where(colors.abs() < _COLORS_LIMIT)
     
-    # Clean and transform each field
-    df['price'] = df['price'].apply(clean_price)
-    df['rating'] = df['rating'].apply(clean_rating)
-    df['colors'] = df['colors'].apply(clean_colors)
-    df['size'] = df['size'].apply(standardize_size)
-    df['gender'] = df['gender'].apply(standardize_gender)
+    size_text, _ = _split_text_and_numbers(df['size'])
+    df['size'] = size_text.str.upper().str.strip().map(SIZE_MAPPING)
+    gender_text, _ = _split_text_and_numbers(df['gender'])
+    df['gender'] = gender_text.str.upper().str.strip().map(GENDER_MAPPING)
     
     # Filter out invalid data
     print("Filtering out invalid data...")
     
-    # Remove rows with invalid titles
-    df = df[df['title'].apply(is_valid_title)]
+    # Keep rows with a valid title, no null/invalid values in critical fields
+    # and a non-zero price (same rules as is_valid_title), applied as one mask
+    valid_mask = (
+        df[['title', 'price', 'rating', 'colors', 'size', 'gender']].notna().all(axis=1)
+        & ~_split_text_and_numbers(df['title'])[0].str.lower().str.strip().isin(INVALID_TITLES)
+        & (df['price'] > 0)
+    )
     
-    # Remove rows with null/invalid values in critical fields
-    df = df.dropna(subset=['title', 'price', 'rating', 'colors', 'size', 'gender'])
+    # Remove duplicates among the valid rows based on title, price, size, and gender
+    # (compared through a single 64-bit hash per row)
+    row_keys = pd.util.hash_pandas_object(df[DEDUP_KEY_COLUMNS], index=False)
+    is_duplicate = row_keys[valid_mask].duplicated(keep='first').reindex(df.index, fill_value=False)
     
-    # Remove rows where price is 0 (Price Unavailable)
-    df = df[df['price'] > 0]
+    # Select the remaining rows in one indexing operation and reset the index in place
+    df = df.loc[valid_mask & ~is_duplicate]
+    df.index = pd.RangeIndex(len(df))
     
-    # Remove duplicates based on title, price, size, and gender
-    df = df.drop_duplicates(subset=['title', 'price', 'size', 'gender'], keep='first')
+    # Colors were parsed as (exact, range-checked) floats to allow missing values;
+    # store them in the smallest integer type that holds every count
+    df['colors'] = pd.to_numeric(df['colors'].astype('int64'), downcast='integer')
     
-    # Reset index
-    df = df.reset_index(drop=True)
+    # Size and gender only take a handful of values, stored as 1-byte category codes
+    df['size'] = df['size'].astype(SIZE_DTYPE)
+    df['gender'] = df['gender'].astype(GENDER_DTYPE)
     
     print(f"Transformation completed. Final dataset has {len(df)} products")
-    print(f"Removed {len(raw_data) - len(df)} invalid/duplicate records")
+    print(f"Removed {num_products - len(df)} invalid/duplicate records")
     
     return df
 